@@ -2,6 +2,10 @@
 """
 FastMCP Server Demonstration
 Shows how to start the server and list available tools
+
+Usage:
+    python demo.py            Load the server and list its tools
+    python demo.py --help     List the tools without loading the server
 """
 
 import sys
@@ -10,68 +14,116 @@ from pathlib import Path
 # Add the current directory to Python path
 sys.path.insert(0, str(Path(__file__).parent))
 
-def main():
-    """Main demonstration function."""
+# Flags that only need the static tool listing, not the server itself
+_FAST_PATH_FLAGS = ('--help', '-h', '--list')
+
+# Static descriptions for the tools registered in server.py
+_TOOL_DESCRIPTIONS = {
+    'get_current_time': '🕒 Get current date and time',
+    'get_weather': '🌤️ Get weather for any city',
+    'create_file': '📝 Create new files',
+    'read_file': '📖 Read file contents',
+    'list_directory': '📁 List directory contents',
+    'execute_command': '💻 Execute shell commands safely',
+    'search_files': '🔍 Search for text in files',
+    'calculate_expression': '🧮 Calculate mathematical expressions',
+    'get_system_info': '⚙️ Get system information',
+    'create_temporary_file': '📄 Create temporary files'
+}
+
+# Display order for the listing, following the curated table above
+_TOOL_ORDER = tuple(_TOOL_DESCRIPTIONS)
+
+def __getattr__(name):
+    """Expose the tool descriptions as the public ``tool_descriptions`` attribute."""
+    if name == 'tool_descriptions':
+        return _TOOL_DESCRIPTIONS
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def _sniff_fast_path(argv):
+    """Check whether the arguments only ask for the static tool listing."""
+    return any(arg in _FAST_PATH_FLAGS for arg in argv)
+
+def _print_banner():
+    """Print the demo banner."""
     print("🚀 FastMCP Multi-Tool Server")
     print("=" * 50)
-    
+
+def _print_tools(tools):
+    """Print a numbered list of tools with their descriptions."""
+    print(f"\n📋 Available Tools ({len(tools)}):")
+    print("-" * 30)
+
+    td = _TOOL_DESCRIPTIONS
+    for i, tool in enumerate(tools, 1):
+        description = td.get(tool, '🔧 Utility tool')
+        print(f"{i:2d}. {description}")
+        print(f"    Function: {tool}")
+
+def _print_usage():
+    """Print usage, documentation and configuration hints."""
+    print("\n" + "=" * 50)
+    print("🎯 How to Use:")
+    print("1. Start the server: python server.py")
+    print("2. Configure Claude Desktop with the server")
+    print("3. Use the tools through Claude's interface")
+
+    print("\n📖 Documentation:")
+    print("See README.md for detailed setup and usage instructions")
+
+    print("\n🔧 Configuration:")
+    print("- Environment file: .env")
+    print("- Add OpenWeatherMap API key for weather functionality")
+
+def _list_tools_fast():
+    """List the known tools without importing the server module."""
+    _print_tools(_TOOL_ORDER)
+
+def _load_server_and_list():
+    """Import the server module and list the tools it registered."""
+    # Imported here so the fast path never pays for FastMCP and its dependencies
+    import server
+
+    print(f"✓ Server initialized: {server.mcp.name}")
+
+    # Get the list of available tools
+    if hasattr(server.mcp, '_tools'):
+        registered = set(server.mcp._tools)
+        # Known tools keep the curated order; only unknown ones need sorting
+        known = [tool for tool in _TOOL_ORDER if tool in registered]
+        _print_tools(known + sorted(registered.difference(_TOOL_ORDER)))
+
+def _main_fast():
+    """List the tools and usage without loading the server."""
+    _print_banner()
+    _list_tools_fast()
+    _print_usage()
+
+def main():
+    """Main demonstration function."""
+    _print_banner()
+
     try:
-        # Import the server module
-        import server
-        
-        print(f"✓ Server initialized: {server.mcp.name}")
-        
-        # Get the list of available tools
-        if hasattr(server.mcp, '_tools'):
-            tools = list(server.mcp._tools.keys())
-            print(f"\n📋 Available Tools ({len(tools)}):")
-            print("-" * 30)
-            
-            tool_descriptions = {
-                'get_current_time': '🕒 Get current date and time',
-                'get_weather': '🌤️ Get weather for any city',
-                'create_file': '📝 Create new files',
-                'read_file': '📖 Read file contents',
-                'list_directory': '📁 List directory contents',
-                'execute_command': '💻 Execute shell commands safely',
-                'search_files': '🔍 Search for text in files',
-                'calculate_expression': '🧮 Calculate mathematical expressions',
-                'get_system_info': '⚙️ Get system information',
-                'create_temporary_file': '📄 Create temporary files'
-            }
-            
-            for i, tool in enumerate(sorted(tools), 1):
-                description = tool_descriptions.get(tool, '🔧 Utility tool')
-                print(f"{i:2d}. {description}")
-                print(f"    Function: {tool}")
-        
-        print("\n" + "=" * 50)
-        print("🎯 How to Use:")
-        print("1. Start the server: python server.py")
-        print("2. Configure Claude Desktop with the server")
-        print("3. Use the tools through Claude's interface")
-        
-        print("\n📖 Documentation:")
-        print("See README.md for detailed setup and usage instructions")
-        
-        print("\n🔧 Configuration:")
-        print("- Environment file: .env")
-        print("- Add OpenWeatherMap API key for weather functionality")
-        
+        _load_server_and_list()
+        _print_usage()
         return True
-        
+
     except Exception as e:
         print(f"❌ Error loading server: {e}")
         return False
 
 if __name__ == "__main__":
+    if _sniff_fast_path(sys.argv[1:]):
+        _main_fast()
+        sys.exit(0)
+
     success = main()
-    
+
     if success:
         print("\n✅ Server is ready to run!")
         print("\nTo start the server now, run:")
         print("python server.py")
     else:
         print("\n❌ Server has issues. Check the error messages above.")
-        
-    sys.exit(0 if success else 1)
\ No newline at end of file
+
+    sys.exit(0 if success else 1)
@@ -2,40 +2,122 @@
 """
 Cross-platform build script for FastMCP Multi-Tool Server
 This script works on Windows, Linux, and macOS
+
+Environment variables:
+    BUILD_CREATE_VENV  Answer the "create a virtual environment?" prompt
+                       without asking: 1/true/yes/y/on creates .venv,
+                       0/false/no/n/off builds in the current environment;
+                       any other value is an error. When stdin is not a
+                       terminal (CI) and this is unset, the prompt is
+                       skipped and the build runs in the current environment.
 """
 
+import importlib
 import os
 import sys
 import subprocess
 import platform
 from pathlib import Path
 
-def run_command(cmd, shell=False):
-    """Run a command and handle errors"""
+# Python command resolved by get_python_command()
+_PY_CMD = None
+
+# Host platform details, looked up once
+_SYSTEM = platform.system().lower()
+_MACHINE = platform.machine()
+
+# Spellings accepted for BUILD_CREATE_VENV
+_TRUTHY = ('1', 'true', 'yes', 'y', 'on')
+_FALSY = ('0', 'false', 'no', 'n', 'off')
+
+def run_command(cmd, shell=False, stream=False):
+    """Run a command and handle errors
+
+    With stream=True the output goes straight to our stdout/stderr instead
+    of being buffered, which suits long-running pip and build calls.
+    """
+    # Buffer output only when the caller wants it back
+    output = {} if stream else {'capture_output': True}
     try:
+        # close_fds=False lets subprocess use posix_spawn() instead of fork()+exec();
+        # inheriting our descriptors is harmless for these build tools
         if isinstance(cmd, str):
-            result = subprocess.run(cmd, shell=True, check=True, capture_output=True, text=True)
+            result = subprocess.run(cmd, shell=True, check=True, text=True, close_fds=False, **output)
         else:
-            result = subprocess.run(cmd, check=True, capture_output=True, text=True, shell=shell)
+            result = subprocess.run(cmd, check=True, text=True, shell=shell, close_fds=False, **output)
         return result.stdout
     except subprocess.CalledProcessError as e:
         print(f"ERROR: Command failed: {e.cmd}")
-        print(f"Error output: {e.stderr}")
+        if e.stderr:
+            print(f"Error output: {e.stderr}")
         sys.exit(1)
 
 def get_python_command():
-    """Get the appropriate Python command for this system"""
+    """Get the appropriate Python command for this system (cached after first lookup)"""
+    global _PY_CMD
+    if _PY_CMD:
+        return _PY_CMD
+    
+    # The interpreter running this script is the cheapest usable choice
+    if sys.executable and os.path.exists(sys.executable):
+        _PY_CMD = sys.executable
+        return _PY_CMD
+    
     for cmd in ['python3', 'python']:
         try:
-            result = subprocess.run([cmd, '--version'], capture_output=True, text=True)
+            result = subprocess.run([cmd, '--version'], capture_output=True, text=True, close_fds=False)
             if result.returncode == 0:
-                return cmd
+                _PY_CMD = cmd
+                return _PY_CMD
         except FileNotFoundError:
             continue
     
     print("ERROR: Python not found in PATH")
     sys.exit(1)
 
+def run_build_frontend(args):
+    """Run the 'build' frontend, in-process when this interpreter can import it"""
+    python_cmd = get_python_command()
+    build_main = None
+    
+    if python_cmd == sys.executable:
+        # This script is itself named build.py, so keep its directory off the
+        # import path to make sure the real 'build' package is found
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        saved_path = sys.path[:]
+        sys.path[:] = [p for p in sys.path if os.path.abspath(p or os.curdir) != script_dir]
+        importlib.invalidate_caches()  # build may have been installed by this run
+        try:
+            from build.__main__ import main as build_main
+        except ImportError:
+            pass
+        finally:
+            sys.path[:] = saved_path
+    
+    if build_main is None:
+        run_command([python_cmd, '-m', 'build'] + args, stream=True)
+        return
+    
+    try:
+        build_main(args)
+    except SystemExit as e:
+        if e.code:
+            print(f"ERROR: Build failed with exit code {e.code}")
+            sys.exit(1)
+
+def _venv_choice_from_env():
+    """Read BUILD_CREATE_VENV: True or False when set, None when unset"""
+    value = os.environ.get('BUILD_CREATE_VENV', '').strip()
+    if not value:
+        return None
+    if value.lower() in _TRUTHY:
+        return True
+    if value.lower() in _FALSY:
+        return False
+    print(f"ERROR: BUILD_CREATE_VENV={value!r} is not recognised; "
+          f"use one of {'/'.join(_TRUTHY)} or {'/'.join(_FALSY)}")
+    sys.exit(1)
+
 def check_virtual_env():
     """Check if we're in a virtual environment or create one"""
     if os.environ.get('VIRTUAL_ENV'):
@@ -51,9 +133,7 @@ def check_virtual_env():
 
 def activate_venv():
     """Activate the virtual environment"""
-    system = platform.system().lower()
-    
-    if system == 'windows':
+    if _SYSTEM == 'windows':
         activate_script = os.path.join('.venv', 'Scripts', 'activate.bat')
         if os.path.exists(activate_script):
             # Note: We can't actually activate in the same process on Windows
@@ -76,8 +156,7 @@ def create_virtual_env():
     print("Virtual environment created successfully!")
     print("To use it:")
     
-    system = platform.system().lower()
-    if system == 'windows':
+    if _SYSTEM == 'windows':
         print("  .venv\\Scripts\\activate")
     else:
         print("  source .venv/bin/activate")
@@ -87,8 +166,7 @@ def install_build_tools():
     python_cmd = get_python_command()
     
     print("Installing/upgrading build tools...")
-    run_command([python_cmd, '-m', 'pip', 'install', '--upgrade', 'pip'])
-    run_command([python_cmd, '-m', 'pip', 'install', '--upgrade', 'setuptools', 'wheel', 'build'])
+    run_command([python_cmd, '-m', 'pip', 'install', '--upgrade', 'pip', 'setuptools', 'wheel', 'build'], stream=True)
 
 def install_dependencies():
     """Install project dependencies"""
@@ -96,7 +174,7 @@ def install_dependencies():
     
     if os.path.exists('requirements.txt'):
         print("Installing project dependencies...")
-        run_command([python_cmd, '-m', 'pip', 'install', '-r', 'requirements.txt'])
+        run_command([python_cmd, '-m', 'pip', 'install', '-r', 'requirements.txt'], stream=True)
     else:
         print("No requirements.txt found, skipping dependency installation")
 
@@ -106,33 +184,30 @@ def clean_build_artifacts():
     
     import shutil
     
-    directories_to_clean = ['build', 'dist', '*.egg-info', '__pycache__']
-    
-    for pattern in directories_to_clean:
-        if '*' in pattern:
-            # Handle glob patterns
-            import glob
-            for path in glob.glob(pattern):
-                if os.path.isdir(path):
-                    shutil.rmtree(path)
-                else:
-                    os.remove(path)
+    # Top-level build outputs
+    targets = {path for path in (Path('build'), Path('dist')) if path.exists()}
+    
+    # One walk collects nested egg-info and __pycache__ directories; hidden
+    # directories (.git, .venv) and virtual environments are left untouched
+    for root, dirs, _ in os.walk('.'):
+        for name in list(dirs):
+            if name == '__pycache__' or name.endswith('.egg-info'):
+                targets.add(Path(root, name))
+                dirs.remove(name)
+            elif name.startswith('.') or name == 'venv':
+                dirs.remove(name)
+    
+    for path in targets:
+        if path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
         else:
-            if os.path.exists(pattern):
-                if os.path.isdir(pattern):
-                    shutil.rmtree(pattern)
-                else:
-                    os.remove(pattern)
+            path.unlink()
 
 def build_package():
     """Build the package"""
-    python_cmd = get_python_command()
-    
-    print("Building source distribution...")
-    run_command([python_cmd, '-m', 'build', '--sdist'])
-    
-    print("Building wheel distribution...")
-    run_command([python_cmd, '-m', 'build', '--wheel'])
+    # A single build invocation produces both the sdist and the wheel
+    print("Building source and wheel distributions...")
+    run_build_frontend(['--sdist', '--wheel'])
 
 def main():
     """Main build function"""
@@ -140,7 +215,7 @@ def main():
     print("FastMCP Multi-Tool Server Build Script")
     print("=" * 50)
     print(f"Platform: {platform.system()} {platform.release()}")
-    print(f"Architecture: {platform.machine()}")
+    print(f"Architecture: {_MACHINE}")
     
     # Change to project root directory if we're in scripts directory
     current_dir = os.getcwd()
@@ -154,23 +229,31 @@ def main():
     
     # Check Python
     python_cmd = get_python_command()
-    version_output = subprocess.run([python_cmd, '--version'], capture_output=True, text=True)
+    version_output = subprocess.run([python_cmd, '--version'], capture_output=True, text=True, close_fds=False)
     print(f"Python: {version_output.stdout.strip()}")
     
     # Check if we need to create or use virtual environment
     if not check_virtual_env():
-        response = input("No virtual environment found. Create one? [Y/n]: ").strip().lower()
-        if response in ['', 'y', 'yes']:
+        create_venv = _venv_choice_from_env()
+        if create_venv is None:
+            if sys.stdin and sys.stdin.isatty():
+                response = input("No virtual environment found. Create one? [Y/n] "
+                                 "(set BUILD_CREATE_VENV=1/0 to skip this prompt): ").strip().lower()
+                create_venv = response == '' or response in _TRUTHY
+            else:
+                # Never block a non-interactive run waiting for an answer
+                create_venv = False
+        if create_venv:
             create_virtual_env()
             print("\nPlease activate the virtual environment and run this script again:")
-            system = platform.system().lower()
-            if system == 'windows':
+            if _SYSTEM == 'windows':
                 print("  .venv\\Scripts\\activate")
                 print("  python scripts/build.py")
             else:
                 print("  source .venv/bin/activate")
                 print("  python scripts/build.py")
             return
+        print("Continuing without a virtual environment")
     
     try:
         # Install build tools
@@ -193,10 +276,11 @@ def main():
         print("Build artifacts created in 'dist' folder:")
         
         if os.path.exists('dist'):
-            for file in os.listdir('dist'):
-                file_path = os.path.join('dist', file)
-                size = os.path.getsize(file_path)
-                print(f"  {file} ({size:,} bytes)")
+            # DirEntry carries the stat result, saving a syscall per file
+            with os.scandir('dist') as it:
+                for entry in it:
+                    if entry.is_file():
+                        print(f"  {entry.name} ({entry.stat().st_size:,} bytes)")
         
         print()
         print("To install locally:")
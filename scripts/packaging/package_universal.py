@@ -2,52 +2,141 @@
 """
 Cross-platform packaging script for FastMCP Multi-Tool Server
 Works on Windows, Linux, and macOS
+
+Environment variables:
+    PKG_COMPRESS_LEVEL  Deflate level (0-9) for the distribution archives.
+                        Defaults to 1 for fast builds; use 9 for releases.
+                        Other values are rejected before the build starts.
+    FORCE_REBUILD       Set to 1 to rebuild the wheel even when dist/
+                        already holds one newer than the sources.
 """
 
+import importlib
 import os
 import sys
 import subprocess
-import shutil
-import zipfile
-import tarfile
 import platform
 from pathlib import Path
 
-def run_command(cmd, shell=False):
-    """Run a command and handle errors"""
+# Python command resolved by get_python_command()
+_PY_CMD = None
+
+# Host platform details, looked up once
+_SYSTEM = platform.system().lower()
+
+# Files that feed into the built wheel and sdist
+PACKAGE_SOURCES = ('server.py', 'setup.py', 'requirements.txt', 'README.md', 'MANIFEST.in')
+
+# Archive members that gain nothing from another round of deflate
+PRECOMPRESSED_SUFFIXES = ('.whl', '.gz', '.zip')
+
+def run_command(cmd, shell=False, stream=False):
+    """Run a command and handle errors
+
+    With stream=True the output goes straight to our stdout/stderr instead
+    of being buffered, which suits long-running pip and build calls.
+    """
+    # Buffer output only when the caller wants it back
+    output = {} if stream else {'capture_output': True}
     try:
+        # close_fds=False lets subprocess use posix_spawn() instead of fork()+exec();
+        # inheriting our descriptors is harmless for these build tools
         if isinstance(cmd, str):
-            result = subprocess.run(cmd, shell=True, check=True, capture_output=True, text=True)
+            result = subprocess.run(cmd, shell=True, check=True, text=True, close_fds=False, **output)
         else:
-            result = subprocess.run(cmd, check=True, capture_output=True, text=True, shell=shell)
+            result = subprocess.run(cmd, check=True, text=True, shell=shell, close_fds=False, **output)
         return result.stdout
     except subprocess.CalledProcessError as e:
         print(f"ERROR: Command failed: {e.cmd}")
-        print(f"Error output: {e.stderr}")
+        if e.stderr:
+            print(f"Error output: {e.stderr}")
         sys.exit(1)
 
 def get_python_command():
-    """Get the appropriate Python command for this system"""
+    """Get the appropriate Python command for this system (cached after first lookup)"""
+    global _PY_CMD
+    if _PY_CMD:
+        return _PY_CMD
+    
+    # The interpreter running this script is the cheapest usable choice
+    if sys.executable and os.path.exists(sys.executable):
+        _PY_CMD = sys.executable
+        return _PY_CMD
+    
     for cmd in ['python3', 'python']:
         try:
-            result = subprocess.run([cmd, '--version'], capture_output=True, text=True)
+            result = subprocess.run([cmd, '--version'], capture_output=True, text=True, close_fds=False)
             if result.returncode == 0:
-                return cmd
+                _PY_CMD = cmd
+                return _PY_CMD
         except FileNotFoundError:
             continue
     
     print("ERROR: Python not found in PATH")
     sys.exit(1)
 
+def run_build_frontend(args):
+    """Run the 'build' frontend, in-process when this interpreter can import it"""
+    python_cmd = get_python_command()
+    build_main = None
+    
+    if python_cmd == sys.executable:
+        importlib.invalidate_caches()  # build was just installed by build_package()
+        try:
+            from build.__main__ import main as build_main
+        except ImportError:
+            pass
+    
+    if build_main is None:
+        run_command([python_cmd, '-m', 'build'] + args, stream=True)
+        return
+    
+    try:
+        build_main(args)
+    except SystemExit as e:
+        if e.code:
+            print(f"ERROR: Build failed with exit code {e.code}")
+            sys.exit(1)
+
+def _compress_level_from_env():
+    """Read PKG_COMPRESS_LEVEL as a deflate level (0-9), defaulting to 1"""
+    value = os.environ.get('PKG_COMPRESS_LEVEL', '').strip()
+    if not value:
+        return 1
+    try:
+        level = int(value)
+    except ValueError:
+        level = None
+    if level is not None and 0 <= level <= 9:
+        return level
+    print(f"ERROR: PKG_COMPRESS_LEVEL={value!r} is not a compression level; use 0-9")
+    sys.exit(1)
+
+def wheel_is_current():
+    """Check whether dist/ holds a wheel newer than every packaged source file"""
+    sources = [p for p in PACKAGE_SOURCES if os.path.exists(p)]
+    if not sources or not os.path.isdir('dist'):
+        return False
+    
+    src_mtime = max(os.path.getmtime(p) for p in sources)
+    with os.scandir('dist') as it:
+        return any(entry.name.endswith('.whl') and entry.stat().st_mtime > src_mtime for entry in it)
+
 def build_package():
     """Build the Python package"""
+    if os.environ.get('FORCE_REBUILD') != '1' and wheel_is_current():
+        print("✓ Wheel cache hit, skipping package build (set FORCE_REBUILD=1 to rebuild)")
+        return
+    
     print("Building Python package...")
     python_cmd = get_python_command()
     
     # Install build tools
-    run_command([python_cmd, '-m', 'pip', 'install', '--upgrade', 'pip', 'setuptools', 'wheel', 'build'])
+    run_command([python_cmd, '-m', 'pip', 'install', '--upgrade', 'pip', 'setuptools', 'wheel', 'build'], stream=True)
     
     # Clean previous builds
+    import shutil
+    
     for path in ['build', 'dist', '*.egg-info']:
         if os.path.exists(path):
             if os.path.isdir(path):
@@ -56,13 +145,25 @@ def build_package():
                 os.remove(path)
     
     # Build source and wheel distributions
-    run_command([python_cmd, '-m', 'build', '--sdist'])
-    run_command([python_cmd, '-m', 'build', '--wheel'])
+    run_build_frontend(['--sdist', '--wheel'])
     
     print("✓ Package built successfully")
 
+def link_or_copy(src, dst):
+    """Hardlink src to dst, falling back to a real copy across filesystems"""
+    if os.path.isdir(dst):
+        dst = os.path.join(dst, os.path.basename(src))
+    try:
+        os.link(src, dst)
+    except OSError:
+        import shutil
+        shutil.copy2(src, dst)
+    return dst
+
 def create_package_structure(dist_dir, package_name):
     """Create the package directory structure"""
+    import shutil
+    
     package_dir = os.path.join(dist_dir, package_name)
     
     # Clean and create directories
@@ -76,20 +177,51 @@ def create_package_structure(dist_dir, package_name):
         'demo.py', 'test_server.py', 'setup.py', 'MANIFEST.in'
     ]
     
+    # Hardlinks avoid copying file contents; the archives read the same bytes
     for file in files_to_copy:
         if os.path.exists(file):
-            shutil.copy2(file, package_dir)
+            link_or_copy(file, package_dir)
     
     # Copy distribution files
     if os.path.exists('dist'):
-        shutil.copytree('dist', os.path.join(package_dir, 'dist'))
+        shutil.copytree('dist', os.path.join(package_dir, 'dist'), copy_function=link_or_copy)
     
     return package_dir
 
-def create_cross_platform_scripts(package_dir):
-    """Create installation and startup scripts for all platforms"""
+def write_text_files(package_dir, files):
+    """Write (filename, content, executable) entries into the package directory"""
+    import tempfile
+    
+    # Temporary files are created 0600; scripts get 0755 and other files the
+    # 0666 & ~umask that open() would give them. Reading the umask means
+    # setting it, so it is restored straight away
+    umask = os.umask(0)
+    os.umask(umask)
+    
+    for filename, content, executable in files:
+        file_path = Path(package_dir, filename)
+        # Encode once with explicit line endings: CRLF for batch files, LF otherwise
+        if filename.endswith('.bat'):
+            content = content.replace('\n', '\r\n')
+        
+        # Write to a temporary file and rename it into place, so an interrupted
+        # run never leaves a half-written script behind to be archived
+        tmp = tempfile.NamedTemporaryFile(dir=package_dir, delete=False, mode='wb')
+        try:
+            with tmp:
+                tmp.write(content.encode('utf-8'))
+            # Make shell scripts executable on Unix systems
+            if os.name != 'nt':
+                os.chmod(tmp.name, 0o755 if executable else 0o666 & ~umask)
+            os.replace(tmp.name, file_path)
+        except BaseException:
+            os.unlink(tmp.name)
+            raise
+
+def create_package_files(package_dir):
+    """Create installation scripts, startup scripts and documentation for all platforms"""
     
-    # Create .env.example
+    # Environment configuration template
     env_content = """# FastMCP Multi-Tool Server Environment Configuration
 #
 # Weather API Configuration (Optional)
@@ -100,8 +232,6 @@ def create_cross_platform_scripts(package_dir):
 #MCP_SERVER_NAME=FastMCP-Multi-Tool-Server
 #MCP_SERVER_VERSION=1.0.0
 """
-    with open(os.path.join(package_dir, '.env.example'), 'w') as f:
-        f.write(env_content)
     
     # Windows installation script
     install_bat = """@echo off
@@ -210,26 +340,7 @@ echo "Press Ctrl+C to stop"
 python server.py
 """
     
-    # Write all scripts
-    scripts = [
-        ('install.bat', install_bat),
-        ('start_server.bat', start_bat),
-        ('install.sh', install_sh),
-        ('start_server.sh', start_sh)
-    ]
-    
-    for filename, content in scripts:
-        script_path = os.path.join(package_dir, filename)
-        with open(script_path, 'w', newline='\n' if filename.endswith('.sh') else '\r\n') as f:
-            f.write(content)
-        
-        # Make shell scripts executable on Unix systems
-        if filename.endswith('.sh') and os.name != 'nt':
-            os.chmod(script_path, 0o755)
-
-def create_documentation(package_dir):
-    """Create comprehensive documentation"""
-    
+    # Quick start guide
     quick_start = """# FastMCP Multi-Tool Server - Quick Start Guide
 
 ## Installation
@@ -292,36 +403,80 @@ python demo.py
 GitHub: https://github.com/rt0120-Ramco/mcp-py
 """
     
-    with open(os.path.join(package_dir, 'QUICK_START.md'), 'w') as f:
-        f.write(quick_start)
-
-def create_archives(dist_dir, package_name):
-    """Create platform-specific archives"""
-    system = platform.system().lower()
-    
-    if system == 'windows':
+    write_text_files(package_dir, [
+        ('.env.example', env_content, False),
+        ('install.bat', install_bat, False),
+        ('start_server.bat', start_bat, False),
+        ('install.sh', install_sh, True),
+        ('start_server.sh', start_sh, True),
+        ('QUICK_START.md', quick_start, False),
+    ])
+
+def create_archives(dist_dir, package_name, level=1):
+    """Create platform-specific archives, deflated at the given level (0-9)"""
+    if _SYSTEM == 'windows':
+        import zipfile
+        
         # Create ZIP for Windows
         zip_name = f"{package_name}-v1.0.0-Windows.zip"
         zip_path = os.path.join(dist_dir, zip_name)
         
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=level) as zipf:
             package_path = os.path.join(dist_dir, package_name)
             for root, dirs, files in os.walk(package_path):
                 for file in files:
                     file_path = os.path.join(root, file)
                     arcname = os.path.relpath(file_path, dist_dir)
-                    zipf.write(file_path, arcname)
+                    # Wheels and sdists are already compressed; deflating them again wastes CPU
+                    if file.endswith(PRECOMPRESSED_SUFFIXES):
+                        zipf.write(file_path, arcname, compress_type=zipfile.ZIP_STORED)
+                    else:
+                        zipf.write(file_path, arcname)
         
         print(f"✓ Created Windows package: {zip_path}")
     
     else:
+        import shutil
+        import tarfile
+        
         # Create TAR.GZ for Linux/macOS
         tar_name = f"{package_name}-v1.0.0-Unix.tar.gz"
         tar_path = os.path.join(dist_dir, tar_name)
         
-        with tarfile.open(tar_path, 'w:gz') as tar:
-            package_path = os.path.join(dist_dir, package_name)
-            tar.add(package_path, arcname=package_name)
+        package_path = os.path.join(dist_dir, package_name)
+        pigz = shutil.which('pigz')
+        
+        try:
+            if pigz:
+                # Stream an uncompressed tar through pigz, which deflates on all cores
+                with open(tar_path, 'wb') as out:
+                    proc = subprocess.Popen([pigz, '-c', f'-{level}', '-p', str(os.cpu_count() or 1)],
+                                            stdin=subprocess.PIPE, stdout=out, close_fds=False)
+                    broken_pipe = False
+                    try:
+                        with tarfile.open(fileobj=proc.stdin, mode='w|') as tar:
+                            tar.add(package_path, arcname=package_name)
+                    except BrokenPipeError:
+                        # pigz exited early; its exit status below says why
+                        broken_pipe = True
+                    finally:
+                        try:
+                            proc.stdin.close()
+                        except BrokenPipeError:
+                            broken_pipe = True
+                        returncode = proc.wait()
+                if returncode != 0:
+                    raise RuntimeError(f"pigz exited with status {returncode}")
+                if broken_pipe:
+                    raise RuntimeError("pigz stopped reading its input")
+            else:
+                with tarfile.open(tar_path, 'w:gz', compresslevel=level) as tar:
+                    tar.add(package_path, arcname=package_name)
+        except BaseException:
+            # Never leave a truncated archive behind in the distribution folder
+            if os.path.exists(tar_path):
+                os.remove(tar_path)
+            raise
         
         print(f"✓ Created Unix package: {tar_path}")
 
@@ -332,6 +487,9 @@ def main():
     print("=" * 50)
     print()
     
+    # Check settings before any slow build work starts
+    compress_level = _compress_level_from_env()
+    
     # Change to project root directory
     script_dir = os.path.dirname(os.path.abspath(__file__))
     project_root = os.path.join(script_dir, '..', '..')
@@ -351,17 +509,13 @@ def main():
         print("Creating package structure...")
         package_dir = create_package_structure(dist_dir, package_name)
         
-        # Step 3: Create cross-platform scripts
-        print("Creating installation scripts...")
-        create_cross_platform_scripts(package_dir)
-        
-        # Step 4: Create documentation
-        print("Creating documentation...")
-        create_documentation(package_dir)
+        # Step 3: Create cross-platform scripts and documentation
+        print("Creating installation scripts and documentation...")
+        create_package_files(package_dir)
         
-        # Step 5: Create archives
+        # Step 4: Create archives
         print("Creating distribution archives...")
-        create_archives(dist_dir, package_name)
+        create_archives(dist_dir, package_name, compress_level)
         
         print()
         print("=" * 50)
@@ -373,11 +527,10 @@ def main():
         print()
         
         # List created files
-        for item in os.listdir(dist_dir):
-            item_path = os.path.join(dist_dir, item)
-            if os.path.isfile(item_path):
-                size = os.path.getsize(item_path)
-                print(f"  {item} ({size:,} bytes)")
+        with os.scandir(dist_dir) as it:
+            for entry in it:
+                if entry.is_file():
+                    print(f"  {entry.name} ({entry.stat().st_size:,} bytes)")
         
         print()
         print("Ready for distribution!")
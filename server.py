@@ -4,17 +4,35 @@ FastMCP Server with Multiple Tools
 A comprehensive MCP server with various utility tools
 """
 
+import errno
 import json
+import math
 import os
+import platform
+import re
+import stat
 import sys
 import subprocess
 import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache, partial
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
+# psutil is optional; get_system_info reports how to install it when missing
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
 # Import FastMCP
 from fastmcp import FastMCP
 
@@ -24,10 +42,81 @@ load_dotenv()
 # Initialize FastMCP server
 mcp = FastMCP("Multi-Tool MCP Server")
 
+# Shared HTTP session so repeated API calls reuse pooled keep-alive connections
+_HTTP = requests.Session()
+_HTTP.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+_HTTP.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+# Recent get_weather results per city as (expiry time, result), oldest first;
+# weather data changes slowly, so repeat lookups within the TTL skip the API
+_WEATHER_CACHE_TTL = 15 * 60
+_WEATHER_CACHE_SIZE = 512
+_weather_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_weather_cache_lock = threading.Lock()
+
+# Accessors for the fields get_weather reads from an OpenWeatherMap response;
+# a missing field still raises KeyError naming it
+_WX_FIELDS = itemgetter("name", "sys", "main", "weather", "wind")
+_WX_MAIN = itemgetter("temp", "feels_like", "humidity", "pressure")
+
+# Commands blocked by execute_command, matched case-insensitively; \s+ also
+# catches variants padded with extra whitespace
+_DANGEROUS_RX = re.compile(r"rm\s+-rf|del\s+/f|format|shutdown|reboot", re.IGNORECASE)
+
+# Threads used by search_files; file reads release the GIL, so the pool
+# keeps the disk busy while other files are being scanned
+_SEARCH_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Default cap on the entries returned by list_directory and search_files, so
+# huge trees do not turn into multi-megabyte tool responses
+_MAX_RESULTS = 500
+
+# Files above this size are searched by search_files as raw bytes, one
+# _SCAN_CHUNK_SIZE read at a time, instead of being decoded whole
+_CHUNKED_SCAN_THRESHOLD = 64 * 1024
+_SCAN_CHUNK_SIZE = 1024 * 1024
+
+# Suffixes of files search_files skips without opening; their contents are
+# not text, so decoding them only yields junk matches
+_BINARY_EXTS = frozenset({
+    '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.ico', '.pdf',
+    '.zip', '.tar', '.gz', '.bz2', '.xz', '.7z', '.whl',
+    '.exe', '.dll', '.so', '.dylib', '.o', '.a', '.bin',
+    '.class', '.jar', '.pyc', '.pyo', '.mp3', '.mp4', '.wav',
+})
+
+# Line endings recognised in raw bytes, as text-mode open() does
+_LINE_BREAK_BYTES_RX = re.compile(rb'\r\n?|\n')
+
+# search_files reports at most this many matching lines per file
+_MAX_LINES_PER_FILE = 10
+
+# Read size used by read_file once the expected file size has been read
+_READ_CHUNK_SIZE = 64 * 1024
+
+# Characters, names and namespace allowed by calculate_expression
+_ALLOWED_CHARS = frozenset('0123456789+-*/().= ')
+_ALLOWED_NAMES = frozenset({'abs', 'round', 'min', 'max', 'pow', 'sqrt', 'sin', 'cos', 'tan', 'pi', 'e'})
+_TOKEN_RX = re.compile(r'[a-zA-Z_][a-zA-Z0-9_]*')
+_SAFE_DICT = {
+    "__builtins__": {},
+    "abs": abs,
+    "round": round,
+    "min": min,
+    "max": max,
+    "pow": pow,
+    "sqrt": math.sqrt,
+    "sin": math.sin,
+    "cos": math.cos,
+    "tan": math.tan,
+    "pi": math.pi,
+    "e": math.e
+}
+
 @mcp.tool()
 def get_current_time() -> str:
     """Get the current date and time."""
-    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return datetime.now().isoformat(sep=' ', timespec='seconds')
 
 @mcp.tool()
 def get_weather(city: str) -> Dict[str, Any]:
@@ -44,28 +133,51 @@ def get_weather(city: str) -> Dict[str, Any]:
     if not api_key:
         return {"error": "OpenWeatherMap API key not configured. Set OPENWEATHER_API_KEY environment variable."}
     
+    cache_key = city.strip().lower()
+    with _weather_cache_lock:
+        cached = _weather_cache.get(cache_key)
+        if cached and cached[0] > time.monotonic():
+            _weather_cache.move_to_end(cache_key)
+            return cached[1]
+    
     try:
         url = f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={api_key}&units=metric"
-        response = requests.get(url, timeout=10)
+        response = _HTTP.get(url, timeout=10)
         response.raise_for_status()
         
         data = response.json()
-        return {
-            "city": data["name"],
-            "country": data["sys"]["country"],
-            "temperature": data["main"]["temp"],
-            "feels_like": data["main"]["feels_like"],
-            "humidity": data["main"]["humidity"],
-            "pressure": data["main"]["pressure"],
-            "description": data["weather"][0]["description"],
-            "wind_speed": data["wind"]["speed"],
+        name, sys_info, main, weather, wind = _WX_FIELDS(data)
+        temperature, feels_like, humidity, pressure = _WX_MAIN(main)
+        result = {
+            "city": name,
+            "country": sys_info["country"],
+            "temperature": temperature,
+            "feels_like": feels_like,
+            "humidity": humidity,
+            "pressure": pressure,
+            "description": weather[0]["description"],
+            "wind_speed": wind["speed"],
             "visibility": data.get("visibility", "N/A")
         }
+        
+        # Only successful lookups are cached; errors are retried on the next call
+        with _weather_cache_lock:
+            _weather_cache[cache_key] = (time.monotonic() + _WEATHER_CACHE_TTL, result)
+            _weather_cache.move_to_end(cache_key)
+            if len(_weather_cache) > _WEATHER_CACHE_SIZE:
+                _weather_cache.popitem(last=False)
+        return result
     except requests.RequestException as e:
         return {"error": f"Failed to fetch weather data: {str(e)}"}
     except KeyError as e:
         return {"error": f"Unexpected API response format: {str(e)}"}
 
+def _write_all(fd: int, data: bytes) -> None:
+    """Write all of data to a raw file descriptor, resuming after short writes."""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
 @mcp.tool()
 def create_file(filepath: str, content: str) -> Dict[str, Any]:
     """
@@ -83,15 +195,20 @@ def create_file(filepath: str, content: str) -> Dict[str, Any]:
         path = Path(filepath)
         path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Write content to file
-        with open(path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        # Write the encoded content straight to the descriptor, skipping the
+        # text-mode wrapper and its newline translation
+        data = content.encode('utf-8')
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o666)
+        try:
+            _write_all(fd, data)
+        finally:
+            os.close(fd)
             
         return {
             "success": True,
             "message": f"File created successfully at {filepath}",
             "size": len(content),
-            "absolute_path": str(path.absolute())
+            "absolute_path": os.path.abspath(path)
         }
     except Exception as e:
         return {
@@ -112,21 +229,42 @@ def read_file(filepath: str) -> Dict[str, Any]:
     """
     try:
         path = Path(filepath)
-        if not path.exists():
+        try:
+            # O_BINARY keeps Windows from translating newlines under us
+            fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+        except FileNotFoundError:
             return {
                 "success": False,
                 "error": f"File does not exist: {filepath}"
             }
             
-        with open(path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        try:
+            # A single fstat on the open descriptor replaces separate exists() and stat() calls
+            st = os.fstat(fd)
+            if stat.S_ISDIR(st.st_mode):
+                raise IsADirectoryError(errno.EISDIR, os.strerror(errno.EISDIR), str(path))
+                
+            # Read the whole file in one call sized from fstat; keep reading until
+            # EOF in case it grew or reports no size (e.g. /proc files)
+            chunks = []
+            chunk = os.read(fd, st.st_size or _READ_CHUNK_SIZE)
+            while chunk:
+                chunks.append(chunk)
+                chunk = os.read(fd, _READ_CHUNK_SIZE)
+        finally:
+            os.close(fd)
+            
+        content = b''.join(chunks).decode('utf-8')
+        # Normalise newlines as text-mode open() would
+        if '\r' in content:
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
             
         return {
             "success": True,
             "content": content,
             "size": len(content),
-            "absolute_path": str(path.absolute()),
-            "last_modified": datetime.fromtimestamp(path.stat().st_mtime).strftime("%Y-%m-%d %H:%M:%S")
+            "absolute_path": os.path.abspath(path),
+            "last_modified": datetime.fromtimestamp(st.st_mtime).isoformat(sep=' ', timespec='seconds')
         }
     except Exception as e:
         return {
@@ -135,16 +273,26 @@ def read_file(filepath: str) -> Dict[str, Any]:
         }
 
 @mcp.tool()
-def list_directory(directory_path: str) -> Dict[str, Any]:
+def list_directory(directory_path: str, include_metadata: bool = True, max_results: int = _MAX_RESULTS) -> Dict[str, Any]:
     """
     List contents of a directory.
     
     Args:
         directory_path: Path to the directory to list
+        include_metadata: Include size and last-modified time for each entry;
+            set to False to list names and types only, without any stat calls
+        max_results: Maximum number of entries to return; "truncated" is set
+            when the directory holds more
         
     Returns:
         Dictionary with directory contents or error message
     """
+    if max_results < 0:
+        return {
+            "success": False,
+            "error": f"max_results must not be negative: {max_results}"
+        }
+    
     try:
         path = Path(directory_path)
         if not path.exists():
@@ -159,20 +307,33 @@ def list_directory(directory_path: str) -> Dict[str, Any]:
                 "error": f"Path is not a directory: {directory_path}"
             }
             
+        # DirEntry answers is_dir()/is_file() from the directory listing and
+        # caches its stat() result, so each entry costs at most one stat call
+        with os.scandir(path) as it:
+            entries = [(not entry.is_dir(), entry.name, entry) for entry in it]
+        # Directories first, then by name; sorting the key tuples keeps the
+        # comparisons off the result dicts
+        entries.sort(key=lambda key: key[:2])
+        truncated = len(entries) > max_results
+        
         items = []
-        for item in path.iterdir():
-            items.append({
-                "name": item.name,
-                "type": "directory" if item.is_dir() else "file",
-                "size": item.stat().st_size if item.is_file() else None,
-                "last_modified": datetime.fromtimestamp(item.stat().st_mtime).strftime("%Y-%m-%d %H:%M:%S")
-            })
+        for is_file, name, entry in entries[:max_results]:
+            item = {
+                "name": name,
+                "type": "file" if is_file else "directory"
+            }
+            if include_metadata:
+                entry_stat = entry.stat()
+                item["size"] = entry_stat.st_size if entry.is_file() else None
+                item["last_modified"] = datetime.fromtimestamp(entry_stat.st_mtime).isoformat(sep=' ', timespec='seconds')
+            items.append(item)
             
         return {
             "success": True,
-            "directory": str(path.absolute()),
-            "items": sorted(items, key=lambda x: (x["type"], x["name"])),
-            "total_items": len(items)
+            "directory": os.path.abspath(path),
+            "items": items,
+            "total_items": len(entries),
+            "truncated": truncated
         }
     except Exception as e:
         return {
@@ -194,8 +355,7 @@ def execute_command(command: str, working_directory: Optional[str] = None) -> Di
     """
     try:
         # Security check - prevent dangerous commands
-        dangerous_commands = ['rm -rf', 'del /f', 'format', 'shutdown', 'reboot']
-        if any(dangerous in command.lower() for dangerous in dangerous_commands):
+        if _DANGEROUS_RX.search(command):
             return {
                 "success": False,
                 "error": "Command contains potentially dangerous operations and was blocked"
@@ -220,7 +380,7 @@ def execute_command(command: str, working_directory: Optional[str] = None) -> Di
             "return_code": result.returncode,
             "stdout": result.stdout,
             "stderr": result.stderr,
-            "working_directory": str(cwd.absolute())
+            "working_directory": os.path.abspath(cwd)
         }
     except subprocess.TimeoutExpired:
         return {
@@ -233,8 +393,168 @@ def execute_command(command: str, working_directory: Optional[str] = None) -> Di
             "error": f"Failed to execute command: {str(e)}"
         }
 
+def _iter_files(root: str, file_extension: Optional[str] = None):
+    """
+    Lazily walk a directory tree with os.scandir, yielding file entries.
+    
+    Directory checks use the cached d_type of each DirEntry, and files are
+    filtered by extension on their name before anything else touches them.
+    """
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif (not file_extension or entry.name.endswith(file_extension)) and entry.is_file():
+                        yield entry
+        except OSError:
+            # The root itself must be readable; unreadable subdirectories are skipped
+            if current is root:
+                raise
+            continue
+
+def _find_matching_lines(rx, content, limit: int = _MAX_LINES_PER_FILE, line_number: int = 1) -> List[Dict[str, Any]]:
+    """
+    Collect up to limit lines of content that match a compiled pattern.
+    
+    content is either a str or bytes, in which case rx must be a bytes
+    pattern and matching lines are decoded one by one. line_number is the
+    number of the first line in content.
+    Raw bytes still hold \r and \r\n line endings, so like text-mode open()
+    they are split on \r, \n and \r\n. Line numbers are counted
+    incrementally between matches, so the content is scanned once and never
+    split into a list of lines.
+    """
+    is_text = isinstance(content, str)
+    matching_lines = []
+    counted_to = 0
+    match = rx.search(content)
+    while match:
+        if is_text:
+            line_start = content.rfind('\n', 0, match.start()) + 1
+            line_end = content.find('\n', match.end())
+            if line_end == -1:
+                line_end = len(content)
+            next_start = line_end + 1
+            line_number += content.count('\n', counted_to, line_start)
+        else:
+            line_start = max(content.rfind(b'\n', 0, match.start()), content.rfind(b'\r', 0, match.start())) + 1
+            line_break = _LINE_BREAK_BYTES_RX.search(content, match.end())
+            line_end = line_break.start() if line_break else len(content)
+            next_start = line_break.end() if line_break else line_end + 1
+            # line_start always follows a complete line ending, so no \r\n pair
+            # is split across spans
+            line_number += _count_line_breaks(content[counted_to:line_start])
+        counted_to = line_start
+        
+        line = content[line_start:line_end]
+        if not is_text:
+            line = line.decode('utf-8', errors='ignore')
+        matching_lines.append({
+            "line_number": line_number,
+            "content": line.strip()
+        })
+        
+        # Resume after this line so each line is reported once
+        if len(matching_lines) >= limit or next_start > len(content):
+            break
+        match = rx.search(content, next_start)
+    return matching_lines
+
+def _count_line_breaks(data: bytes) -> int:
+    """Count \r, \n and \r\n line endings in raw bytes, each as one break."""
+    return data.count(b'\n') + data.count(b'\r') - data.count(b'\r\n')
+
+def _scan_chunks(f, rx_bytes) -> List[Dict[str, Any]]:
+    """
+    Collect up to _MAX_LINES_PER_FILE matching lines from an unbuffered binary file.
+    
+    The file is read _SCAN_CHUNK_SIZE bytes at a time and each read is
+    searched up to its last complete line; the partial line at its end is
+    carried into the next read. Memory therefore stays bounded by the chunk
+    size plus the longest line, and a file truncated mid-scan simply ends
+    early, where a memory map would fault the whole process with SIGBUS.
+    """
+    matching_lines = []
+    line_number = 1
+    carry = b''
+    while len(matching_lines) < _MAX_LINES_PER_FILE:
+        chunk = f.read(_SCAN_CHUNK_SIZE)
+        buf = carry + chunk
+        if not chunk:
+            # Whatever is left is the last line, which has no line ending
+            matching_lines += _find_matching_lines(rx_bytes, buf, _MAX_LINES_PER_FILE - len(matching_lines), line_number)
+            break
+        
+        # Split after the last line ending; a trailing \r may be the first
+        # half of a \r\n pair, so it waits for the next read
+        cut = max(buf.rfind(b'\n'), buf.rfind(b'\r', 0, len(buf) - 1))
+        if cut == -1:
+            carry = buf
+            continue
+        body_end = cut - 1 if buf[cut:cut + 1] == b'\n' and buf[cut - 1:cut] == b'\r' else cut
+        body = buf[:body_end]
+        carry = buf[cut + 1:]
+        
+        matching_lines += _find_matching_lines(rx_bytes, body, _MAX_LINES_PER_FILE - len(matching_lines), line_number)
+        line_number += _count_line_breaks(body) + 1
+    return matching_lines
+
+def _scan_file(file_path: str, rx, rx_bytes, find_lines: bool) -> Optional[List[Dict[str, Any]]]:
+    """
+    Scan one file for a compiled pattern.
+    
+    Files larger than _CHUNKED_SCAN_THRESHOLD are searched in chunks with
+    rx_bytes, when given, instead of being decoded into a str.
+    
+    Returns the matching lines, or None when the file does not match or
+    cannot be read.
+    """
+    try:
+        with open(file_path, 'rb', buffering=0) as f:
+            if rx_bytes is not None and os.fstat(f.fileno()).st_size > _CHUNKED_SCAN_THRESHOLD:
+                # rx_bytes never spans a line ending, so every match is on a line
+                return _scan_chunks(f, rx_bytes) or None
+            data = f.readall()
+    except Exception:
+        # Skip files that can't be read (binary files, etc.)
+        return None
+    
+    content = data.decode('utf-8', errors='ignore')
+    # Normalise newlines as text-mode open() would
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    if not rx.search(content):
+        return None
+    return _find_matching_lines(rx, content) if find_lines else []
+
+def _scan_in_order(executor, scan, files, window: int):
+    """
+    Yield (file_path, scan result) pairs in walk order.
+    
+    At most window scans are queued at a time, so the walk only runs as far
+    ahead as the consumer needs; scans still pending when the consumer stops
+    early are cancelled.
+    """
+    pending = deque()
+    try:
+        for file_path in files:
+            pending.append((file_path, executor.submit(scan, file_path)))
+            if len(pending) >= window:
+                file_path, future = pending.popleft()
+                yield file_path, future.result()
+        while pending:
+            file_path, future = pending.popleft()
+            yield file_path, future.result()
+    finally:
+        for _, future in pending:
+            future.cancel()
+
 @mcp.tool()
-def search_files(directory: str, pattern: str, file_extension: Optional[str] = None) -> Dict[str, Any]:
+def search_files(directory: str, pattern: str, file_extension: Optional[str] = None, max_results: int = _MAX_RESULTS) -> Dict[str, Any]:
     """
     Search for files containing a specific pattern.
     
@@ -242,10 +562,18 @@ def search_files(directory: str, pattern: str, file_extension: Optional[str] = N
         directory: Directory to search in
         pattern: Text pattern to search for
         file_extension: Optional file extension filter (e.g., '.py', '.txt')
+        max_results: Maximum number of matching files to return; the search
+            stops early and sets "truncated" once more files match
         
     Returns:
         Dictionary with search results
     """
+    if max_results < 0:
+        return {
+            "success": False,
+            "error": f"max_results must not be negative: {max_results}"
+        }
+    
     try:
         path = Path(directory)
         if not path.exists():
@@ -255,46 +583,57 @@ def search_files(directory: str, pattern: str, file_extension: Optional[str] = N
             }
             
         matches = []
+        # Case-insensitive literal match, run by the C regex engine instead of
+        # lowercasing a copy of every file
+        rx = re.compile(re.escape(pattern), re.IGNORECASE)
+        # Large files are searched as raw bytes; bytes patterns only fold ASCII
+        # case, so other patterns keep the decoded path. Raw bytes keep their
+        # \r\n endings, which text mode turns into \n, so patterns spanning a
+        # line ending keep the decoded path as well
+        use_bytes = pattern.isascii() and '\r' not in pattern and '\n' not in pattern
+        rx_bytes = re.compile(re.escape(pattern.encode('utf-8')), re.IGNORECASE) if use_bytes else None
         
-        # Get all files matching extension filter
-        if file_extension:
-            files = path.rglob(f"*{file_extension}")
-        else:
-            files = path.rglob("*")
-            files = [f for f in files if f.is_file()]
-            
-        for file_path in files:
-            if file_path.is_file():
-                try:
-                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        content = f.read()
-                        if pattern.lower() in content.lower():
-                            # Find line numbers containing the pattern
-                            lines = content.split('\n')
-                            matching_lines = []
-                            for i, line in enumerate(lines, 1):
-                                if pattern.lower() in line.lower():
-                                    matching_lines.append({
-                                        "line_number": i,
-                                        "content": line.strip()
-                                    })
-                                    
-                            matches.append({
-                                "file": str(file_path.relative_to(path)),
-                                "absolute_path": str(file_path.absolute()),
-                                "matching_lines": matching_lines[:10]  # Limit to first 10 matches per file
-                            })
-                except:
-                    # Skip files that can't be read (binary files, etc.)
+        # Walked paths all start with the root, so relative and absolute paths
+        # are built by slicing rather than per-file relpath/abspath. The root is
+        # the validated Path, which turns '' into '.'
+        root = os.fspath(path)
+        abs_directory = os.path.abspath(root)
+        root_len = len(os.path.join(root, ''))
+        
+        # A multi-line pattern can match a file but never a single line
+        find_lines = '\n' not in pattern
+        # Known binary files are skipped by name, unless they were asked for
+        skip_binary = (file_extension or '').lower() not in _BINARY_EXTS
+        files = (
+            entry.path for entry in _iter_files(root, file_extension)
+            if not (skip_binary and os.path.splitext(entry.name)[1].lower() in _BINARY_EXTS)
+        )
+        scan = partial(_scan_file, rx=rx, rx_bytes=rx_bytes, find_lines=find_lines)
+        
+        truncated = False
+        with ThreadPoolExecutor(max_workers=_SEARCH_WORKERS) as executor:
+            # Files are queued as the walk reaches them, a few per worker ahead
+            # of the results being read back in walk order
+            for file_path, matching_lines in _scan_in_order(executor, scan, files, _SEARCH_WORKERS * 4):
+                if matching_lines is None:
                     continue
+                if len(matches) >= max_results:
+                    truncated = True
+                    break
+                matches.append({
+                    "file": file_path[root_len:],
+                    "absolute_path": os.path.join(abs_directory, file_path[root_len:]),
+                    "matching_lines": matching_lines
+                })
                     
         return {
             "success": True,
             "pattern": pattern,
-            "directory": str(path.absolute()),
+            "directory": abs_directory,
             "file_extension": file_extension,
             "matches": matches,
-            "total_files_with_matches": len(matches)
+            "total_files_with_matches": len(matches),
+            "truncated": truncated
         }
     except Exception as e:
         return {
@@ -302,6 +641,11 @@ def search_files(directory: str, pattern: str, file_extension: Optional[str] = N
             "error": f"Failed to search files: {str(e)}"
         }
 
+@lru_cache(maxsize=1024)
+def _compile_expression(expression: str):
+    """Compile an expression once; repeated calculations skip the parser."""
+    return compile(expression, "<string>", "eval")
+
 @mcp.tool()
 def calculate_expression(expression: str) -> Dict[str, Any]:
     """
@@ -315,41 +659,20 @@ def calculate_expression(expression: str) -> Dict[str, Any]:
     """
     try:
         # Security check - only allow safe mathematical operations
-        allowed_chars = set('0123456789+-*/().= ')
-        allowed_names = {'abs', 'round', 'min', 'max', 'pow', 'sqrt'}
-        
         # Remove spaces and check characters
         clean_expr = expression.replace(' ', '')
-        if not all(c in allowed_chars or c.isalnum() for c in clean_expr):
+        if not all(c in _ALLOWED_CHARS or c.isalnum() for c in clean_expr):
             # Check if it contains only allowed function names
-            import re
-            tokens = re.findall(r'[a-zA-Z_][a-zA-Z0-9_]*', expression)
-            if any(token not in allowed_names for token in tokens):
+            tokens = _TOKEN_RX.findall(expression)
+            if any(token not in _ALLOWED_NAMES for token in tokens):
                 return {
                     "success": False,
                     "error": "Expression contains disallowed characters or functions"
                 }
         
-        # Import math for advanced functions
-        import math
-        
-        # Create a safe namespace for evaluation
-        safe_dict = {
-            "__builtins__": {},
-            "abs": abs,
-            "round": round,
-            "min": min,
-            "max": max,
-            "pow": pow,
-            "sqrt": math.sqrt,
-            "sin": math.sin,
-            "cos": math.cos,
-            "tan": math.tan,
-            "pi": math.pi,
-            "e": math.e
-        }
-        
-        result = eval(expression, safe_dict)
+        # The namespace is shared between calls, so give each evaluation its own
+        # locals to keep assignment expressions from rebinding its names
+        result = eval(_compile_expression(expression), _SAFE_DICT, {})
         
         return {
             "success": True,
@@ -363,6 +686,17 @@ def calculate_expression(expression: str) -> Dict[str, Any]:
             "error": f"Failed to evaluate expression: {str(e)}"
         }
 
+@lru_cache(maxsize=None)
+def _static_system_info() -> Dict[str, Any]:
+    """Collect the system details that cannot change while the server runs."""
+    return {
+        "system": platform.system(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "python_version": platform.python_version(),
+        "cpu_count": psutil.cpu_count()
+    }
+
 @mcp.tool()
 def get_system_info() -> Dict[str, Any]:
     """
@@ -371,30 +705,28 @@ def get_system_info() -> Dict[str, Any]:
     Returns:
         Dictionary with system details
     """
+    if psutil is None:
+        return {
+            "success": False,
+            "error": "psutil package required for system info. Install with: pip install psutil"
+        }
+    
     try:
-        import platform
-        import psutil
+        static_info = _static_system_info()
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage('C:' if static_info["system"] == 'Windows' else '/')
         
         return {
             "success": True,
-            "system": platform.system(),
-            "platform": platform.platform(),
-            "processor": platform.processor(),
-            "python_version": platform.python_version(),
-            "cpu_count": psutil.cpu_count(),
-            "memory_total": psutil.virtual_memory().total,
-            "memory_available": psutil.virtual_memory().available,
+            **static_info,
+            "memory_total": memory.total,
+            "memory_available": memory.available,
             "disk_usage": {
-                "total": psutil.disk_usage('/').total if platform.system() != 'Windows' else psutil.disk_usage('C:').total,
-                "used": psutil.disk_usage('/').used if platform.system() != 'Windows' else psutil.disk_usage('C:').used,
-                "free": psutil.disk_usage('/').free if platform.system() != 'Windows' else psutil.disk_usage('C:').free
+                "total": disk.total,
+                "used": disk.used,
+                "free": disk.free
             }
         }
-    except ImportError:
-        return {
-            "success": False,
-            "error": "psutil package required for system info. Install with: pip install psutil"
-        }
     except Exception as e:
         return {
             "success": False,
@@ -414,9 +746,13 @@ def create_temporary_file(content: str, suffix: str = ".txt") -> Dict[str, Any]:
         Dictionary with temporary file details
     """
     try:
-        with tempfile.NamedTemporaryFile(mode='w', suffix=suffix, delete=False, encoding='utf-8') as tmp_file:
-            tmp_file.write(content)
-            tmp_path = tmp_file.name
+        data = content.encode('utf-8')
+        # mkstemp hands back a raw binary descriptor, written without a file object
+        fd, tmp_path = tempfile.mkstemp(suffix=suffix)
+        try:
+            _write_all(fd, data)
+        finally:
+            os.close(fd)
             
         return {
             "success": True,
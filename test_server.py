@@ -102,6 +102,37 @@ def test_tool_functions():
         except Exception as e:
             print(f"✗ create_temporary_file failed: {e}")
             
+        # Test list_directory without metadata
+        try:
+            result = server.list_directory(".", include_metadata=False)
+            names_only = all(set(item) == {"name", "type"} for item in result.get("items", []))
+            print(f"✓ list_directory (no metadata): {result.get('success', False) and names_only}")
+        except Exception as e:
+            print(f"✗ list_directory failed: {e}")
+
+        # Test list_directory with a result cap
+        try:
+            result = server.list_directory(".", max_results=1)
+            capped = len(result.get("items", [])) == 1 and result.get("truncated", False)
+            rejected = not server.list_directory(".", max_results=-1).get("success", True)
+            print(f"✓ list_directory (max_results): {result.get('success', False) and capped and rejected}")
+        except Exception as e:
+            print(f"✗ list_directory failed: {e}")
+
+        # Test search_files gives the same lines for small and chunk-scanned files
+        try:
+            import tempfile
+            lines = "\r".join(["filler"] * 5000 + ["needle here"]) + "\r\n"
+            with tempfile.TemporaryDirectory() as small_dir, tempfile.TemporaryDirectory() as large_dir:
+                Path(small_dir, "f.txt").write_bytes(lines.encode("utf-8"))
+                Path(large_dir, "f.txt").write_bytes((lines + "x" * 70000).encode("utf-8"))
+                small = server.search_files(small_dir, "needle")["matches"]
+                large = server.search_files(large_dir, "needle")["matches"]
+                same = small[0]["matching_lines"] == large[0]["matching_lines"]
+            print(f"✓ search_files (small vs chunked): {same}")
+        except Exception as e:
+            print(f"✗ search_files failed: {e}")
+
         # Test get_system_info
         try:
             result = server.get_system_info()